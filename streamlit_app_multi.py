@@ -2,10 +2,17 @@ import streamlit as st
 import os
 import sys
 import subprocess
+import shutil
+import tempfile
 from pathlib import Path
 import time
 import zipfile
-import io
+import json
+from collections import deque
+import re
+import asyncio
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # audio_extractor.py의 AudioExtractor 클래스를 직접 가져오기
 # Streamlit 환경에서 moviepy.editor가 아닌 moviepy.video.io.VideoFileClip에서 VideoFileClip을 가져오도록 수정
@@ -17,17 +24,165 @@ except ImportError:
     except ImportError:
         VideoFileClip = None
 
-from pydub import AudioSegment
+# PyAV (선택 사항): 짧은 파일을 ffmpeg 프로세스 실행 없이 같은 프로세스 안에서 변환
+try:
+    import av
+except ImportError:
+    av = None
+
+
+# 임시 파일 위치: RAM 기반 tmpfs(/dev/shm)를 쓸 수 있으면 디스크 대신 사용
+if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+    TMP_DIR = "/dev/shm"
+else:
+    TMP_DIR = tempfile.gettempdir()
+
+
+def get_scratch_dir(size):
+    """
+    size 바이트를 저장할 임시 파일 위치
+    
+    tmpfs는 메모리를 사용하므로 남은 메모리의 절반 또는 tmpfs 여유 공간을 넘는 파일은 디스크에 저장
+    """
+    disk_dir = tempfile.gettempdir()
+    if TMP_DIR == disk_dir:
+        return disk_dir
+    try:
+        available_memory = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        if size < available_memory * 0.5 and size < shutil.disk_usage(TMP_DIR).free:
+            return TMP_DIR
+    except (OSError, ValueError):
+        pass
+    return disk_dir
+
+
+# ffmpeg 진행 상황 출력의 "time=HH:MM:SS.xx" 부분 (-progress 출력의 out_time=도 포함)
+FFMPEG_TIME_PATTERN = re.compile(rb"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+# -progress 출력의 "key=value" 줄 (오류 로그에서 제외)
+FFMPEG_PROGRESS_LINE_PATTERN = re.compile(rb"^[a-z0-9_]+=.*\n?", re.MULTILINE)
+
+
+async def _run_ffmpeg(cmd, on_progress=None):
+    """
+    ffmpeg 프로세스를 실행하고 stdout/stderr를 동시에 읽기
+    
+    on_progress: 처리된 시간(초)을 받는 콜백 (stderr의 진행 상황 줄에서 추출)
+    반환값: (종료 코드, stdout 바이트, stderr 바이트)
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    
+    async def read_stderr():
+        stderr = bytearray()
+        while chunk := await process.stderr.read(64 * 1024):
+            if on_progress:
+                # 진행 상황 줄은 \r로 갱신되므로 줄 단위가 아닌 블록 단위로 마지막 시간만 사용
+                matches = FFMPEG_TIME_PATTERN.findall(chunk)
+                if matches:
+                    hours, minutes, seconds = matches[-1]
+                    on_progress(int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+            stderr += chunk
+        return bytes(stderr)
+    
+    stdout, stderr = await asyncio.gather(process.stdout.read(), read_stderr())
+    returncode = await process.wait()
+    if on_progress:
+        stderr = FFMPEG_PROGRESS_LINE_PATTERN.sub(b"", stderr)
+    return returncode, stdout, stderr
+
+
+def run_ffmpeg(cmd, on_progress=None):
+    """
+    _run_ffmpeg의 동기 실행 버전 (작업 스레드마다 별도 이벤트 루프 사용)
+    """
+    return asyncio.run(_run_ffmpeg(cmd, on_progress))
+
+
+# 하드웨어 가속 초기화 실패를 나타내는 ffmpeg 오류 메시지 (이 경우에만 소프트웨어 디코딩으로 재시도)
+# (오류 줄에는 입력 파일 경로도 포함되므로 "cuda" 같은 단어가 아닌 ffmpeg 메시지 문구로 판단)
+HWACCEL_ERROR_PATTERN = re.compile(
+    rb"Device creation failed"
+    rb"|No device available for decoder"
+    rb"|Hardware device setup failed"
+    rb"|Failed setup for format"
+    rb"|hwaccel initialisation returned error"
+    rb"|doesn't support hardware accelerated",
+    re.IGNORECASE,
+)
+
+
+# 이 길이(초)를 넘는 영상은 구간별 병렬 추출 사용
+SEGMENT_MIN_DURATION = 600
+# 여러 파일을 ffmpeg 프로세스 하나로 함께 처리할 때 그룹당 최대 파일 수
+BATCH_SIZE = 8
+# 이 길이(초) 이하의 짧은 영상은 PyAV로 추출 (ffmpeg 프로세스 실행 비용이 인코딩 시간보다 큼)
+PYAV_MAX_DURATION = 10
+
+
+@lru_cache(maxsize=256)
+def _probe_json(file_path, mtime_ns, size):
+    """
+    ffprobe로 첫 번째 오디오 스트림 정보와 전체 길이 조회
+    
+    mtime_ns, size는 캐시 키로만 사용되며, 파일이 바뀌면 다시 조회합니다.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "quiet",
+        "-print_format",
+        "json",
+        "-select_streams",
+        "a:0",  # 첫 번째 오디오 스트림만 조회
+        "-show_streams",
+        "-show_entries",
+        "format=duration",  # MKV/WebM은 스트림에 길이가 없으므로 컨테이너 길이도 조회
+        file_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
 
 
 class AudioExtractor:
     """영상에서 오디오를 추출하는 클래스"""
     
-    def __init__(self):
-        self.supported_video_formats = [
-            ".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v"
-        ]
-        self.supported_audio_formats = [".mp3", ".flac", ".wav", ".aac", ".ogg"]
+    supported_video_formats = [
+        ".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v"
+    ]
+    supported_audio_formats = [".mp3", ".flac", ".wav", ".aac", ".ogg"]
+    # 출력 형식별로 재인코딩 없이 그대로 복사할 수 있는 원본 코덱
+    copy_compatible_codecs = {
+        ".mp3": {"mp3"},
+        ".flac": {"flac"},
+        ".aac": {"aac"},
+        ".ogg": {"vorbis", "opus"},
+    }
+    # PyAV/MoviePy로 추출할 때 출력 형식별 인코더
+    encoder_codecs = {
+        ".mp3": "libmp3lame",
+        ".flac": "flac",
+        ".wav": "pcm_s16le",
+        ".aac": "aac",
+        ".ogg": "libvorbis",
+    }
+    # PyAV로 ffmpeg 경로와 같은 인코더 설정을 지정하는 형식 (OGG는 -q:a VBR 품질 설정이 없어 ffmpeg 사용)
+    pyav_formats = {".mp3", ".flac", ".wav", ".aac"}
+    # 임시 파일 없이 stdout 파이프로 출력할 수 있는 형식과 ffmpeg muxer 이름
+    # (FLAC/WAV는 인코딩이 끝난 뒤 헤더를 다시 써야 하므로 파일로 저장)
+    pipe_muxers = {".mp3": "mp3", ".aac": "adts", ".ogg": "ogg"}
+    # 출력 형식별 최대 비트레이트 (bps, get_output_args 설정 기준, 임시 파일 위치를 정할 때 사용)
+    output_bit_rates = {".mp3": 320000, ".aac": 256000, ".ogg": 256000}
+    # 긴 영상을 구간별로 나누어 병렬 추출할 수 있는 형식 (concat 시 구간 경계에 빈틈이 없는 무손실 형식만)
+    segment_formats = {".flac", ".wav"}
+    # 입력 위치 지정(-ss)이 샘플 단위로 정확한 원본 컨테이너 (MKV/WebM 등은 구간 경계가 수 ms씩 어긋남)
+    segment_containers = {".mp4", ".mov", ".m4v"}
+    # 디코더 지연(pre-skip) 때문에 -ss 위치가 어긋나는 원본 코덱
+    segment_excluded_codecs = {"opus", "vorbis"}
+    _hwaccels = None  # ffmpeg -hwaccels 조회 결과 캐시 (클래스 전체에서 한 번만 조회)
     
     def validate_input_file(self, input_path):
         """입력 파일 유효성 검사"""
@@ -48,156 +203,392 @@ class AudioExtractor:
         
         return file_ext
     
-    def extract_audio_with_ffmpeg(self, input_path, output_path, format_type):
+    def get_hwaccels(self):
+        """
+        ffmpeg에서 사용 가능한 하드웨어 가속 방식 조회 (최초 1회만 실행 후 클래스에 캐시)
+        """
+        if AudioExtractor._hwaccels is None:
+            try:
+                result = subprocess.run(
+                    ["ffmpeg", "-hide_banner", "-hwaccels"], capture_output=True, text=True
+                )
+                # 첫 줄은 "Hardware acceleration methods:" 헤더
+                lines = result.stdout.splitlines()[1:] if result.returncode == 0 else []
+                AudioExtractor._hwaccels = [line.strip() for line in lines if line.strip()]
+            except Exception:
+                AudioExtractor._hwaccels = []
+        return AudioExtractor._hwaccels
+    
+    def get_hwaccel_args(self):
+        """
+        입력 파일 앞에 붙일 하드웨어 가속 옵션
+        """
+        hwaccels = self.get_hwaccels()
+        if "cuda" in hwaccels:
+            # NVDEC 사용 (레거시 *_cuvid 디코더는 사용하지 않음)
+            return ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+        if hwaccels:
+            # CUDA가 없으면 vaapi/qsv/dxva2 등 사용 가능한 가속 방식을 ffmpeg이 자동 선택
+            return ["-hwaccel", "auto"]
+        return []
+    
+    def is_stream_copy(self, format_type, source_codec):
+        """
+        원본 오디오가 이미 출력 형식의 코덱인지 (재인코딩 없이 스트림 복사 가능한지) 확인
+        """
+        return source_codec in self.copy_compatible_codecs.get(format_type, ())
+    
+    def get_output_args(self, format_type, copy_stream):
+        """
+        출력 형식별 ffmpeg 코덱 옵션
+        """
+        if copy_stream:
+            # 원본 오디오가 이미 출력 형식의 코덱: 디코딩/재인코딩 없이 스트림 복사
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-acodec",
+                "copy",  # 원본 오디오 코덱 복사
+            ]
+        elif format_type == ".mp3":
+            # MP3: 최고 품질 설정 (320kbps)
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-acodec",
+                "libmp3lame",
+                "-ab",
+                "320k",  # 320kbps 비트레이트
+                "-ar",
+                "44100",  # 44.1kHz 샘플레이트
+                "-ac",
+                "2",  # 스테레오
+            ]
+        elif format_type == ".flac":
+            # FLAC: 무손실 압축
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-acodec",
+                "flac",
+                "-compression_level",
+                "8",  # 최고 압축 레벨
+            ]
+        elif format_type == ".wav":
+            # WAV: 무손실 원본
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-acodec",
+                "pcm_s16le",  # 16비트 PCM
+            ]
+        elif format_type == ".aac":
+            # AAC: 원본이 AAC가 아니면 256kbps로 인코딩
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-c:a",
+                "aac",
+                "-b:a",
+                "256k",  # 256kbps 비트레이트
+            ]
+        elif format_type == ".ogg":
+            # OGG: 원본이 Vorbis/Opus가 아니면 Vorbis로 인코딩
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-c:a",
+                "libvorbis",
+                "-q:a",
+                "6",  # VBR 품질 (약 192kbps)
+            ]
+        else:
+            # 기타 형식: 원본 코덱 복사 시도
+            return [
+                "-vn",  # 비디오 스트림 제거
+                "-acodec",
+                "copy",  # 원본 오디오 코덱 복사
+            ]
+    
+    def build_ffmpeg_cmd(self, input_path, output_args, input_args=(), threads=0, progress=False):
+        """
+        ffmpeg 명령어 생성 (output_args는 코덱 옵션과 출력 대상을 포함)
+        """
+        # 오류 메시지만 출력하고, 진행률이 필요하면 -progress로 stderr에 key=value 형식으로 받음
+        log_args = ["-hide_banner", "-loglevel", "error", "-nostats"]
+        if progress:
+            log_args += ["-progress", "pipe:2"]
+        
+        return [
+            "ffmpeg",
+            *log_args,
+            "-filter_threads",
+            str(threads),  # 리샘플링 등 필터 스레드 수
+            *input_args,
+            "-i",
+            input_path,
+            "-threads",
+            str(threads),  # 인코더 스레드 수
+            *output_args,
+        ]
+    
+    def run_ffmpeg_with_hwaccel(self, build_cmd, log_messages, on_progress=None):
+        """
+        하드웨어 가속을 먼저 시도하고, 가속 관련 오류일 때만 (예: 구형 GPU의 AV1, GPU가 없는 환경)
+        소프트웨어 디코딩으로 재시도 (손상된 입력, 디스크 부족 등은 다시 실행하지 않음)
+        
+        build_cmd: 입력 파일 앞에 붙일 옵션(하드웨어 가속 옵션)을 받아 ffmpeg 명령어를 만드는 함수
+        반환값: (종료 코드, stdout 바이트, stderr 바이트)
+        """
+        hwaccel_args = self.get_hwaccel_args()
+        if hwaccel_args:
+            log_messages.append(f"하드웨어 가속 사용: {' '.join(hwaccel_args)}")
+        
+        cmd = build_cmd(hwaccel_args)
+        log_messages.append(f"ffmpeg 명령어 실행: {' '.join(cmd)}")
+        returncode, stdout, stderr = run_ffmpeg(cmd, on_progress)
+        if returncode == 0:
+            return returncode, stdout, stderr
+        log_messages.append(f"ffmpeg 오류: {stderr.decode(errors='replace')}")
+        
+        if hwaccel_args and HWACCEL_ERROR_PATTERN.search(stderr):
+            log_messages.append("하드웨어 가속 오류, 소프트웨어 디코딩으로 재시도...")
+            cmd = build_cmd([])
+            log_messages.append(f"ffmpeg 명령어 실행: {' '.join(cmd)}")
+            returncode, stdout, stderr = run_ffmpeg(cmd, on_progress)
+            if returncode != 0:
+                log_messages.append(f"ffmpeg 오류: {stderr.decode(errors='replace')}")
+        return returncode, stdout, stderr
+    
+    def extract_audio_with_ffmpeg(
+        self, input_path, output_path, format_type, source_codec, log_messages, threads=0, on_progress=None
+    ):
         """
         ffmpeg을 직접 사용하여 오디오 추출 (최고 품질 유지)
+        
+        threads: 인코더/필터 스레드 수 (0이면 ffmpeg이 코어 수에 맞춰 자동 선택)
+        on_progress: 처리된 시간(초)을 받는 콜백
+        
+        반환값: (성공 여부, stdout으로 받은 오디오 바이트 또는 파일로 저장한 경우 None)
         """
         try:
-            if format_type == ".mp3":
-                # MP3: 최고 품질 설정 (320kbps)
-                cmd = [
-                    "ffmpeg",
-                    "-i",
-                    input_path,
-                    "-vn",  # 비디오 스트림 제거
-                    "-acodec",
-                    "libmp3lame",
-                    "-ab",
-                    "320k",  # 320kbps 비트레이트
-                    "-ar",
-                    "44100",  # 44.1kHz 샘플레이트
-                    "-ac",
-                    "2",  # 스테레오
-                    "-y",  # 덮어쓰기 허용
-                    output_path,
-                ]
-            elif format_type == ".flac":
-                # FLAC: 무손실 압축
-                cmd = [
-                    "ffmpeg",
-                    "-i",
-                    input_path,
-                    "-vn",  # 비디오 스트림 제거
-                    "-acodec",
-                    "flac",
-                    "-compression_level",
-                    "8",  # 최고 압축 레벨
-                    "-y",  # 덮어쓰기 허용
-                    output_path,
-                ]
-            elif format_type == ".wav":
-                # WAV: 무손실 원본
-                cmd = [
-                    "ffmpeg",
-                    "-i",
-                    input_path,
-                    "-vn",  # 비디오 스트림 제거
-                    "-acodec",
-                    "pcm_s16le",  # 16비트 PCM
-                    "-y",  # 덮어쓰기 허용
-                    output_path,
-                ]
+            copy_stream = self.is_stream_copy(format_type, source_codec)
+            if copy_stream:
+                log_messages.append(
+                    f"원본 코덱({source_codec})이 출력 형식과 같아 스트림을 그대로 복사합니다."
+                )
+            
+            # 파일 끝에서 헤더를 다시 쓸 필요가 없는 형식은 임시 파일 없이 stdout으로 바로 받음
+            # (스트림 복사는 출력 파일을 그대로 사용)
+            muxer = self.pipe_muxers.get(format_type)
+            pipe_muxer = None if copy_stream else muxer
+            if pipe_muxer:
+                output_target = ["-f", pipe_muxer, "pipe:1"]
+            elif muxer:
+                # 스트림 복사도 컨테이너는 명시 (예: MP4의 AAC를 ADTS로 리먹스)
+                output_target = ["-f", muxer, "-y", output_path]
             else:
-                # 기타 형식: 원본 코덱 복사 시도
+                output_target = ["-y", output_path]  # 덮어쓰기 허용
+            output_args = [*self.get_output_args(format_type, copy_stream), *output_target]
+            
+            returncode, stdout, _ = self.run_ffmpeg_with_hwaccel(
+                lambda input_args: self.build_ffmpeg_cmd(
+                    input_path, output_args, input_args, threads, progress=on_progress is not None
+                ),
+                log_messages,
+                on_progress,
+            )
+            if returncode != 0:
+                return False, None
+            
+            if pipe_muxer:
+                log_messages.append(f"오디오 추출 완료: {Path(output_path).name} (메모리)")
+                return True, stdout
+            
+            log_messages.append(f"오디오 추출 완료: {output_path}")
+            return True, None
+            
+        except Exception as e:
+            log_messages.append(f"ffmpeg 추출 중 오류 발생: {e}")
+            return False, None
+    
+    def extract_audio_parallel_segments(
+        self, input_path, output_path, format_type, n_workers, duration, log_messages, on_progress=None
+    ):
+        """
+        긴 영상을 n_workers개 구간으로 나누어 병렬로 추출한 뒤 concat으로 합치기
+        
+        오디오만 디코딩하므로 키프레임 위치와 상관없이 길이를 균등하게 나눔
+        on_progress: 전체 구간에서 처리된 시간(초)의 합을 받는 콜백
+        """
+        try:
+            segment_length = duration / n_workers
+            segment_progress = [0.0] * n_workers
+            log_messages.append(f"{n_workers}개 구간으로 나누어 병렬 추출 중 (구간당 {segment_length:.1f} 초)")
+            
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(output_path) or None) as segment_dir:
+                segment_paths = [
+                    os.path.join(segment_dir, f"part_{i}{format_type}") for i in range(n_workers)
+                ]
+                
+                if format_type == ".flac":
+                    # FLAC 구간은 합칠 때 다시 인코딩하므로 가장 빠른 압축 레벨로 저장 (무손실)
+                    segment_args = ["-vn", "-acodec", "flac", "-compression_level", "0"]
+                else:
+                    segment_args = self.get_output_args(format_type, False)
+                
+                def extract_segment(i):
+                    # 첫 구간은 -ss 없이 파일 처음부터 (WebM/MKV의 Opus는 -ss 0으로도 첫 프레임이 빠짐)
+                    # 마지막 구간은 길이 제한 없이 파일 끝까지 (길이 반올림 오차로 끝부분이 빠지지 않도록)
+                    input_args = ["-ss", f"{i * segment_length:.6f}"] if i > 0 else []
+                    if i < n_workers - 1:
+                        input_args += ["-t", f"{segment_length:.6f}"]
+                    output_args = [*segment_args, "-y", segment_paths[i]]
+                    
+                    def update(seconds):
+                        segment_progress[i] = seconds
+                        on_progress(sum(segment_progress))
+                    
+                    cmd = self.build_ffmpeg_cmd(
+                        input_path, output_args, input_args, threads=1, progress=on_progress is not None
+                    )
+                    return cmd, run_ffmpeg(cmd, update if on_progress else None)
+                
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    results = list(executor.map(extract_segment, range(n_workers)))
+                
+                for cmd, (returncode, _, stderr) in results:
+                    if returncode != 0:
+                        log_messages.append(f"ffmpeg 명령어 실행: {' '.join(cmd)}")
+                        log_messages.append(f"ffmpeg 오류: {stderr.decode(errors='replace')}")
+                        return False
+                
+                # concat demuxer로 구간 파일 이어 붙이기
+                # WAV는 그대로 복사하고, FLAC은 STREAMINFO 헤더(전체 샘플 수, MD5)가 첫 구간 기준으로 남지 않도록 다시 인코딩
+                if format_type == ".flac":
+                    concat_args = self.get_output_args(format_type, False)
+                else:
+                    concat_args = ["-c", "copy"]
+                list_path = os.path.join(segment_dir, "list.txt")
+                with open(list_path, "w") as f:
+                    for segment_path in segment_paths:
+                        f.write(f"file '{segment_path}'\n")
+                
                 cmd = [
                     "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-nostats",
+                    "-f",
+                    "concat",
+                    "-safe",
+                    "0",
                     "-i",
-                    input_path,
-                    "-vn",  # 비디오 스트림 제거
-                    "-acodec",
-                    "copy",  # 원본 오디오 코덱 복사
-                    "-y",  # 덮어쓰기 허용
+                    list_path,
+                    *concat_args,
+                    "-y",
                     output_path,
                 ]
+                log_messages.append(f"ffmpeg 명령어 실행: {' '.join(cmd)}")
+                returncode, _, stderr = run_ffmpeg(cmd)
+                
+                if returncode != 0:
+                    log_messages.append(f"ffmpeg 오류: {stderr.decode(errors='replace')}")
+                    return False
             
-            st.session_state.log_messages.append(f"ffmpeg 명령어 실행: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                st.session_state.log_messages.append(f"ffmpeg 오류: {result.stderr}")
-                return False
-            
-            st.session_state.log_messages.append(f"오디오 추출 완료: {output_path}")
+            log_messages.append(f"오디오 추출 완료: {output_path}")
             return True
             
         except Exception as e:
-            st.session_state.log_messages.append(f"ffmpeg 추출 중 오류 발생: {e}")
+            log_messages.append(f"구간 병렬 추출 중 오류 발생: {e}")
             return False
     
-    def extract_audio_with_moviepy(self, input_path, output_path):
+    def extract_audio_with_pyav(self, input_path, output_path, format_type, log_messages):
         """
-        MoviePy를 사용하여 오디오 추출 (백업 방법)
+        PyAV를 사용하여 오디오 추출 (짧은 파일용, ffmpeg 프로세스를 실행하지 않음)
         """
         try:
-            st.session_state.log_messages.append("MoviePy를 사용하여 오디오 추출 중...")
-            video = VideoFileClip(input_path)
-            audio = video.audio
-            
-            # 임시 WAV 파일로 추출
-            temp_wav = output_path.replace(Path(output_path).suffix, "_temp.wav")
-            audio.write_audiofile(temp_wav, verbose=False, logger=None)
-            
-            # 원하는 형식으로 변환
-            if not output_path.endswith(".wav"):
-                self.convert_audio_format(temp_wav, output_path)
-                os.remove(temp_wav)  # 임시 파일 삭제
-            else:
-                os.rename(temp_wav, output_path)
-            
-            video.close()
-            audio.close()
+            log_messages.append("PyAV를 사용하여 오디오 추출 중...")
+            with av.open(input_path) as source, av.open(output_path, "w") as target:
+                input_stream = source.streams.audio[0]
+                # 채널 순서가 지정되지 않은 원본("2 channels" 등, AVI의 PCM 등)은 AAC 인코더가 거부하므로 기본 레이아웃 사용
+                layout = {1: "mono", 2: "stereo"}.get(input_stream.channels, input_stream.layout.name)
+                if format_type == ".mp3":
+                    # ffmpeg 경로와 같은 설정: 320kbps, 44.1kHz, 스테레오
+                    output_stream = target.add_stream(
+                        self.encoder_codecs[format_type], rate=44100, layout="stereo"
+                    )
+                    output_stream.bit_rate = 320000
+                elif format_type == ".flac":
+                    # ffmpeg 경로와 같은 설정: 최고 압축 레벨, 16비트보다 정밀한 원본(AAC 등)은 24비트로 저장
+                    output_stream = target.add_stream(
+                        self.encoder_codecs[format_type],
+                        rate=input_stream.rate,
+                        layout=layout,
+                        format="s32" if input_stream.format.bytes > 2 else "s16",
+                        options={"compression_level": "8"},
+                    )
+                else:
+                    output_stream = target.add_stream(
+                        self.encoder_codecs[format_type],
+                        rate=input_stream.rate,
+                        layout=layout,
+                    )
+                    if format_type == ".aac":
+                        output_stream.bit_rate = 256000  # ffmpeg 경로와 같은 256kbps
+                
+                # 인코더가 샘플 포맷/레이아웃/샘플레이트 변환을 자동으로 처리
+                for frame in source.decode(input_stream):
+                    frame.pts = None
+                    for packet in output_stream.encode(frame):
+                        target.mux(packet)
+                for packet in output_stream.encode(None):
+                    target.mux(packet)
             
-            st.session_state.log_messages.append(f"MoviePy로 오디오 추출 완료: {output_path}")
+            log_messages.append(f"PyAV로 오디오 추출 완료: {output_path}")
             return True
             
         except Exception as e:
-            st.session_state.log_messages.append(f"MoviePy 추출 중 오류 발생: {e}")
+            log_messages.append(f"PyAV 추출 중 오류 발생: {e}")
+            # 중간에 실패한 출력 파일은 삭제 (ffmpeg으로 다시 추출)
+            if os.path.exists(output_path):
+                os.remove(output_path)
             return False
     
-    def convert_audio_format(self, input_audio_path, output_path):
+    def extract_audio_with_moviepy(self, input_path, output_path, log_messages):
         """
-        pydub을 사용하여 오디오 형식 변환
+        MoviePy를 사용하여 오디오 추출 (백업 방법)
         """
         try:
-            audio = AudioSegment.from_wav(input_audio_path)
+            log_messages.append("MoviePy를 사용하여 오디오 추출 중...")
+            video = VideoFileClip(input_path)
+            audio = video.audio
             
-            output_format = Path(output_path).suffix[1:]  # 확장자에서 점 제거
+            # 원하는 형식으로 바로 저장 (임시 WAV 파일 없이 한 번에 인코딩)
+            audio_format = Path(output_path).suffix.lower()
+            audio.write_audiofile(
+                output_path,
+                codec=self.encoder_codecs[audio_format],
+                bitrate="320k" if audio_format == ".mp3" else None,
+                logger=None,
+            )
             
-            if output_format == "mp3":
-                audio.export(output_path, format="mp3", bitrate="320k")
-            elif output_format == "flac":
-                audio.export(output_path, format="flac")
-            else:
-                audio.export(output_path, format=output_format)
+            video.close()
+            audio.close()
             
+            log_messages.append(f"MoviePy로 오디오 추출 완료: {output_path}")
             return True
             
         except Exception as e:
-            st.session_state.log_messages.append(f"오디오 형식 변환 중 오류 발생: {e}")
+            log_messages.append(f"MoviePy 추출 중 오류 발생: {e}")
             return False
     
-    def get_audio_info(self, file_path):
+    def get_audio_info(self, file_path, log_messages):
         """
-        오디오 파일 정보 조회
+        오디오 파일 정보 조회 (같은 파일은 ffprobe를 다시 실행하지 않고 캐시 사용)
         """
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                file_path,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            stat = os.stat(file_path)
+            info = _probe_json(file_path, stat.st_mtime_ns, stat.st_size)
             
-            if result.returncode == 0:
-                import json
-                
-                info = json.loads(result.stdout)
-                
+            if info:
+                # 스트림 길이가 없으면 (MKV/WebM 등) 컨테이너 길이 사용
+                format_duration = info.get("format", {}).get("duration", 0)
                 for stream in info.get("streams", []):
                     if stream.get("codec_type") == "audio":
                         return {
@@ -205,89 +596,379 @@ class AudioExtractor:
                             "sample_rate": stream.get("sample_rate"),
                             "channels": stream.get("channels"),
                             "bit_rate": stream.get("bit_rate"),
-                            "duration": float(stream.get("duration", 0)),
+                            "duration": float(stream.get("duration") or format_duration),
                         }
             
             return None
             
         except Exception as e:
-            st.session_state.log_messages.append(f"오디오 정보 조회 중 오류 발생: {e}")
+            log_messages.append(f"오디오 정보 조회 중 오류 발생: {e}")
             return None
     
-    def extract_audio(self, input_path, output_path):
+    def log_audio_info(self, title, info, log_messages):
+        """
+        get_audio_info 결과를 로그에 추가
+        """
+        log_messages.append(title)
+        log_messages.append(f"  코덱: {info.get('codec', 'Unknown')}")
+        log_messages.append(f"  샘플레이트: {info.get('sample_rate', 'Unknown')} Hz")
+        log_messages.append(f"  채널: {info.get('channels', 'Unknown')}")
+        log_messages.append(f"  비트레이트: {info.get('bit_rate', 'Unknown')} bps")
+        log_messages.append(f"  길이: {info.get('duration', 0):.2f} 초")
+    
+    def prepare_extraction(self, input_path, output_path, log_messages):
+        """
+        입력/출력 검증, 출력 디렉토리 생성, 원본 오디오 정보 조회
+        
+        반환값: (출력 형식, 원본 오디오 정보 또는 None)
+        """
+        # 입력 파일 검증
+        self.validate_input_file(input_path)
+        
+        # 출력 형식 검증
+        output_format = self.validate_output_format(output_path)
+        
+        # 출력 디렉토리 생성
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        log_messages.append(f"입력 파일: {input_path}")
+        log_messages.append(f"출력 파일: {output_path}")
+        log_messages.append(f"출력 형식: {output_format}")
+
+        # 원본 비디오 정보 출력
+        video_info = self.get_audio_info(input_path, log_messages)
+        if video_info:
+            self.log_audio_info("원본 오디오 정보:", video_info, log_messages)
+        return output_format, video_info
+    
+    def choose_method(self, input_path, output_format, video_info, threads=0):
+        """
+        추출 방법 선택: "segments" (구간 병렬), "pyav" (짧은 파일), "copy" (스트림 복사), "ffmpeg"
+        """
+        source_codec = video_info.get("codec") if video_info else None
+        duration = video_info.get("duration") if video_info else None
+        
+        if self.is_stream_copy(output_format, source_codec):
+            return "copy"
+        # 긴 영상은 여러 구간으로 나누어 병렬 추출 (짧은 파일은 concat 비용이 더 큼)
+        segment_workers = threads or os.cpu_count() or 1
+        if (
+            duration
+            and duration > SEGMENT_MIN_DURATION
+            and segment_workers > 1
+            and output_format in self.segment_formats
+            and Path(input_path).suffix.lower() in self.segment_containers
+            and source_codec not in self.segment_excluded_codecs
+        ):
+            return "segments"
+        # 짧은 영상은 PyAV로 같은 프로세스 안에서 변환 (ffmpeg 프로세스 실행 비용 절약)
+        if (
+            av is not None
+            and duration
+            and duration <= PYAV_MAX_DURATION
+            and output_format in self.pyav_formats
+            and self.encoder_codecs[output_format] in av.codecs_available
+        ):
+            return "pyav"
+        return "ffmpeg"
+    
+    def can_batch(self, input_path, output_path, threads=0):
         """
-        메인 오디오 추출 함수
+        여러 파일을 ffmpeg 프로세스 하나로 함께 처리할 수 있는지 (일반 ffmpeg 변환 대상인지) 확인
         """
         try:
-            # 입력 파일 검증
             self.validate_input_file(input_path)
-            
-            # 출력 형식 검증
             output_format = self.validate_output_format(output_path)
+        except (FileNotFoundError, ValueError):
+            return False
+        video_info = self.get_audio_info(input_path, [])
+        return (
+            video_info is not None
+            and self.choose_method(input_path, output_format, video_info, threads) == "ffmpeg"
+        )
+    
+    def estimate_output_size(self, input_path, output_format, threads=0):
+        """
+        추출할 오디오의 예상 최대 크기 (바이트, 구간 병렬 추출 시 구간 파일 포함)
+        
+        원본 길이를 알 수 없으면 None
+        """
+        video_info = self.get_audio_info(input_path, [])
+        if not video_info or not video_info.get("duration"):
+            return None
+        duration = video_info["duration"]
+        
+        method = self.choose_method(input_path, output_format, video_info, threads)
+        if method == "copy":
+            # 복사한 오디오 스트림은 입력 파일보다 클 수 없음
+            return os.path.getsize(input_path)
+        if output_format in self.output_bit_rates:
+            return int(duration * self.output_bit_rates[output_format] / 8)
+        
+        # WAV(16비트 PCM) 크기 (FLAC은 이보다 작음)
+        sample_rate = int(video_info.get("sample_rate") or 48000)
+        channels = int(video_info.get("channels") or 2)
+        size = int(duration * sample_rate * channels * 2)
+        if method == "segments":
+            size *= 2  # 구간 파일과 합친 파일이 동시에 존재
+        return size
+    
+    def finish_extraction(self, output_path, audio_bytes, log_messages, show_output_info=False):
+        """
+        추출 결과 확인 및 로그 출력
+        
+        반환값: 추출된 오디오가 있으면 True
+        """
+        if audio_bytes is not None:
+            file_size = len(audio_bytes)
+        elif os.path.exists(output_path):
+            # 추출된 오디오 정보 출력 (표시용이므로 요청한 경우에만 조회)
+            extracted_info = self.get_audio_info(output_path, log_messages) if show_output_info else None
+            if extracted_info:
+                self.log_audio_info("추출된 오디오 정보:", extracted_info, log_messages)
+            
+            file_size = os.path.getsize(output_path)
+        else:
+            log_messages.append("오디오 추출에 실패했습니다.")
+            return False
+        
+        log_messages.append(
+            f"파일 크기: {file_size / (1024*1024):.2f} MB"
+        )
+        log_messages.append("오디오 추출이 성공적으로 완료되었습니다!")
+        return True
+    
+    def extract_audio_batch(self, jobs, log_messages, threads=0, on_progress=None):
+        """
+        여러 파일을 ffmpeg 프로세스 하나로 추출 (입력마다 -i, 출력마다 -map)
+        
+        jobs: [(입력 경로, 출력 경로, 출력 형식)]
+        on_progress: 처리된 시간(초)을 받는 콜백 (ffmpeg은 모든 출력을 같은 속도로 처리하며 진행 시간을 하나만 보고함)
+        반환값: 성공 여부
+        """
+        def build_cmd(input_args):
+            # 하드웨어 가속 옵션은 입력 파일마다 붙임
+            cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostats"]
+            if on_progress:
+                cmd += ["-progress", "pipe:2"]
+            cmd += ["-filter_threads", str(threads)]
+            for input_path, _, _ in jobs:
+                cmd += [*input_args, "-i", input_path]
+            for i, (_, output_path, output_format) in enumerate(jobs):
+                muxer = self.pipe_muxers.get(output_format)
+                cmd += [
+                    "-map",
+                    f"{i}:a:0",  # i번째 입력의 첫 번째 오디오 스트림
+                    "-threads",
+                    str(threads),
+                    *self.get_output_args(output_format, False),
+                    *(["-f", muxer] if muxer else []),
+                    "-y",
+                    output_path,
+                ]
+            return cmd
+        
+        try:
+            returncode, _, _ = self.run_ffmpeg_with_hwaccel(build_cmd, log_messages, on_progress)
+            return returncode == 0
+        except Exception as e:
+            log_messages.append(f"ffmpeg 일괄 추출 중 오류 발생: {e}")
+            return False
+    
+    def extract_audio(
+        self,
+        input_path,
+        output_path,
+        log_messages,
+        show_output_info=False,
+        threads=0,
+        progress_callback=None,
+        prepared=None,
+    ):
+        """
+        메인 오디오 추출 함수 (처리 로그는 log_messages 리스트에 추가)
+        
+        show_output_info: 추출된 파일을 ffprobe로 다시 조회하여 로그에 표시할지 여부
+        threads: ffmpeg 스레드 수 (0이면 자동, 구간 병렬 추출 시에는 동시에 처리할 구간 수)
+        progress_callback: 파일 하나의 진행률(0~1)을 받는 콜백
+        prepared: 이미 실행한 prepare_extraction 결과 (있으면 검증/원본 정보 조회를 다시 하지 않음)
+        
+        반환값: (성공 여부, 메모리로 받은 오디오 바이트 또는 output_path에 저장한 경우 None)
+        """
+        try:
+            if prepared is None:
+                prepared = self.prepare_extraction(input_path, output_path, log_messages)
+            output_format, video_info = prepared
             
-            # 출력 디렉토리 생성
-            output_dir = os.path.dirname(output_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+            # ffmpeg을 우선적으로 사용 (원본 코덱 정보는 스트림 복사 여부 판단에 재사용)
+            source_codec = video_info.get("codec") if video_info else None
+            duration = video_info.get("duration") if video_info else None
+            on_progress = None
+            if progress_callback and duration:
+                on_progress = lambda seconds: progress_callback(min(seconds / duration, 1.0))
             
-            st.session_state.log_messages.append(f"입력 파일: {input_path}")
-            st.session_state.log_messages.append(f"출력 파일: {output_path}")
-            st.session_state.log_messages.append(f"출력 형식: {output_format}")
-
-            # 원본 비디오 정보 출력
-            video_info = self.get_audio_info(input_path)
-            if video_info:
-                st.session_state.log_messages.append("원본 오디오 정보:")
-                st.session_state.log_messages.append(f"  코덱: {video_info.get('codec', 'Unknown')}")
-                st.session_state.log_messages.append(f"  샘플레이트: {video_info.get('sample_rate', 'Unknown')} Hz")
-                st.session_state.log_messages.append(f"  채널: {video_info.get('channels', 'Unknown')}")
-                st.session_state.log_messages.append(f"  비트레이트: {video_info.get('bit_rate', 'Unknown')} bps")
-                st.session_state.log_messages.append(f"  길이: {video_info.get('duration', 0):.2f} 초")
-            # ffmpeg을 우선적으로 사용
-            success = self.extract_audio_with_ffmpeg(
-                input_path, output_path, output_format
-            )
+            method = self.choose_method(input_path, output_format, video_info, threads)
+            audio_bytes = None
+            success = False
+            if method == "segments":
+                segment_workers = threads or os.cpu_count() or 1
+                success = self.extract_audio_parallel_segments(
+                    input_path, output_path, output_format, segment_workers, duration, log_messages, on_progress
+                )
+            elif method == "pyav":
+                success = self.extract_audio_with_pyav(input_path, output_path, output_format, log_messages)
+            
+            if not success:
+                success, audio_bytes = self.extract_audio_with_ffmpeg(
+                    input_path, output_path, output_format, source_codec, log_messages, threads, on_progress
+                )
             
             # ffmpeg 실패 시 MoviePy 사용
             if not success:
-                st.session_state.log_messages.append("ffmpeg 추출 실패, MoviePy로 재시도...")
-                success = self.extract_audio_with_moviepy(input_path, output_path)
+                audio_bytes = None
+                log_messages.append("ffmpeg 추출 실패, MoviePy로 재시도...")
+                success = self.extract_audio_with_moviepy(input_path, output_path, log_messages)
             
-            if success and os.path.exists(output_path):
-                # 추출된 오디오 정보 출력
-                extracted_info = self.get_audio_info(output_path)
-                if extracted_info:
-                    st.session_state.log_messages.append("추출된 오디오 정보:")
-                    st.session_state.log_messages.append(f"  코덱: {extracted_info.get('codec', 'Unknown')}")
-                    st.session_state.log_messages.append(f"  샘플레이트: {extracted_info.get('sample_rate', 'Unknown')} Hz")
-                    st.session_state.log_messages.append(f"  채널: {extracted_info.get('channels', 'Unknown')}")
-                    st.session_state.log_messages.append(f"  비트레이트: {extracted_info.get('bit_rate', 'Unknown')} bps")
-                    st.session_state.log_messages.append(f"  길이: {extracted_info.get('duration', 0):.2f} 초")
-                
-                file_size = os.path.getsize(output_path)
-                st.session_state.log_messages.append(
-                    f"파일 크기: {file_size / (1024*1024):.2f} MB"
-                )
-                st.session_state.log_messages.append("오디오 추출이 성공적으로 완료되었습니다!")
-                return True
-            else:
-                st.session_state.log_messages.append("오디오 추출에 실패했습니다.")
-                return False
+            if success and self.finish_extraction(output_path, audio_bytes, log_messages, show_output_info):
+                return True, audio_bytes
+            if not success:
+                log_messages.append("오디오 추출에 실패했습니다.")
+            return False, None
         
         except Exception as e:
-            st.session_state.log_messages.append(f"오류 발생: {e}")
-            return False
+            log_messages.append(f"오류 발생: {e}")
+            return False, None
+
+
+@st.cache_resource
+def get_extractor():
+    """Streamlit 재실행(rerun) 사이에 재사용할 AudioExtractor"""
+    return AudioExtractor()
+
+
+def _extract_one(
+    extractor, input_path, output_path, show_output_info=False, threads=0, progress_callback=None, prepared=None
+):
+    """
+    파일 하나의 오디오 추출 (작업 스레드에서 실행)
+    
+    Streamlit 세션 상태는 작업 스레드에서 안전하게 접근할 수 없으므로
+    로그를 직접 추가하지 않고 (성공 여부, 오디오 바이트, 로그 목록) 형태로 반환합니다.
+    """
+    log_messages = []
+    success, audio_bytes = extractor.extract_audio(
+        input_path, output_path, log_messages, show_output_info, threads, progress_callback, prepared
+    )
+    return success, audio_bytes, log_messages
+
+
+def _extract_group(extractor, jobs, show_output_info=False, threads=0, progress_callbacks=None):
+    """
+    여러 파일의 오디오 추출 (작업 스레드에서 실행)
+    
+    일반 ffmpeg 변환 대상인 파일이 2개 이상이면 ffmpeg 프로세스 하나로 함께 처리하고,
+    나머지 파일(스트림 복사, PyAV, 구간 병렬 추출 대상)과 일괄 처리에 실패한 파일은 하나씩 처리합니다.
+    
+    jobs: [(입력 경로, 출력 경로)]
+    반환값: 파일마다 (성공 여부, 오디오 바이트, 로그 목록)
+    """
+    progress_callbacks = progress_callbacks or [None] * len(jobs)
+    results = [None] * len(jobs)
+    
+    batch = [
+        i
+        for i, (input_path, output_path) in enumerate(jobs)
+        if extractor.can_batch(input_path, output_path, threads)
+    ]
+    if len(batch) > 1:
+        # 입력 검증과 원본 정보 조회는 일괄 처리 전에 파일마다 한 번만 실행 (파일별 재시도 시 재사용)
+        prepared = {}
+        file_logs = {}
+        for i in batch:
+            file_logs[i] = []
+            prepared[i] = extractor.prepare_extraction(*jobs[i], file_logs[i])
+        
+        # ffmpeg이 보고하는 진행 시간 하나를 파일마다 각자의 길이로 나누어 진행률로 변환
+        # (마지막 보고는 가장 짧은 출력 기준 시간이므로 줄어든 값은 무시)
+        progress_seconds = [0.0]
+        
+        def on_progress(seconds):
+            progress_seconds[0] = max(progress_seconds[0], seconds)
+            for i in batch:
+                duration = prepared[i][1].get("duration")
+                if progress_callbacks[i] and duration:
+                    progress_callbacks[i](min(progress_seconds[0] / duration, 1.0))
+        
+        batch_jobs = [(*jobs[i], prepared[i][0]) for i in batch]
+        batch_log = [f"{len(batch)}개 파일을 ffmpeg 프로세스 하나로 함께 추출"]
+        success = extractor.extract_audio_batch(
+            batch_jobs,
+            batch_log,
+            threads,
+            on_progress if any(progress_callbacks[i] for i in batch) else None,
+        )
+        
+        for i in batch:
+            input_path, output_path = jobs[i]
+            log_messages = file_logs[i] + batch_log
+            if success:
+                log_messages.append(f"오디오 추출 완료: {output_path}")
+                if extractor.finish_extraction(output_path, None, log_messages, show_output_info):
+                    results[i] = (True, None, log_messages)
+                    continue
+            
+            # 일괄 처리에 실패하면 파일별로 다시 추출
+            log_messages.append("일괄 추출 실패, 파일별로 재시도...")
+            if progress_callbacks[i]:
+                progress_callbacks[i](0.0)
+            success_one, audio_bytes, retry_log = _extract_one(
+                extractor, input_path, output_path, show_output_info, threads, progress_callbacks[i], prepared[i]
+            )
+            results[i] = (success_one, audio_bytes, log_messages + retry_log)
+    
+    for i, (input_path, output_path) in enumerate(jobs):
+        if results[i] is None:
+            results[i] = _extract_one(
+                extractor, input_path, output_path, show_output_info, threads, progress_callbacks[i]
+            )
+    return results
+
+
+# 이미 압축된 오디오 형식 (ZIP에서 다시 압축해도 크기가 거의 줄지 않음)
+PRECOMPRESSED_AUDIO_FORMATS = {".mp3", ".flac", ".aac", ".ogg", ".m4a"}
+
+
+def get_zip_compression(file_name, use_lzma=False):
+    """ZIP에 추가할 파일의 (압축 방식, 압축 레벨)"""
+    if Path(file_name).suffix.lower() in PRECOMPRESSED_AUDIO_FORMATS:
+        return zipfile.ZIP_STORED, None  # 압축 없이 저장
+    if use_lzma:
+        return zipfile.ZIP_LZMA, None
+    return zipfile.ZIP_DEFLATED, 1  # WAV(PCM) 등은 빠른 압축
 
 
-def create_zip_file(file_paths, zip_name):
-    """여러 파일을 ZIP으로 압축"""
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+def create_zip_file(file_paths, zip_path, audio_bytes=None, use_lzma=False):
+    """여러 파일을 ZIP으로 압축 (메모리 대신 zip_path 파일에 직접 기록)
+    
+    audio_bytes: 파일 없이 메모리로 받은 오디오 {파일명: 바이트}
+    use_lzma: 압축이 필요한 파일(WAV 등)에 ZIP_DEFLATED 대신 ZIP_LZMA 사용
+    """
+    with zipfile.ZipFile(zip_path, 'w') as zip_file:
+        for name, data in (audio_bytes or {}).items():
+            compress_type, compresslevel = get_zip_compression(name, use_lzma)
+            zip_file.writestr(name, data, compress_type=compress_type, compresslevel=compresslevel)
         for file_path in file_paths:
             if os.path.exists(file_path):
-                zip_file.write(file_path, os.path.basename(file_path))
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+                compress_type, compresslevel = get_zip_compression(file_path, use_lzma)
+                zip_file.write(
+                    file_path,
+                    os.path.basename(file_path),
+                    compress_type=compress_type,
+                    compresslevel=compresslevel,
+                )
+    return zip_path
 
 
 # Streamlit 앱 시작
@@ -296,10 +977,20 @@ st.title("🎥 영상 오디오 추출기 (다중 파일)")
 st.markdown("영상 파일에서 오디오를 MP3, FLAC 등 다양한 형식으로 추출합니다. 여러 파일을 동시에 처리할 수 있습니다.")
 
 # 세션 상태 초기화
+# 로그는 최근 LOG_MAX_LINES줄만 보관하고, 화면에 표시할 문자열은 로그가 바뀔 때만 다시 만듦
+LOG_MAX_LINES = 500
 if "log_messages" not in st.session_state:
-    st.session_state.log_messages = []
+    st.session_state.log_messages = deque(maxlen=LOG_MAX_LINES)
+if "log_text_cache" not in st.session_state:
+    st.session_state.log_text_cache = None
 if "output_audio_paths" not in st.session_state:
     st.session_state.output_audio_paths = []
+if "output_audio_bytes" not in st.session_state:
+    st.session_state.output_audio_bytes = {}
+if "zip_paths" not in st.session_state:
+    st.session_state.zip_paths = {}  # {LZMA 사용 여부: 이미 만든 ZIP 파일 경로}
+if "work_dirs" not in st.session_state:
+    st.session_state.work_dirs = {}  # {기본 임시 위치: 이번 추출 작업용 TemporaryDirectory}
 if "processing_complete" not in st.session_state:
     st.session_state.processing_complete = False
 
@@ -313,6 +1004,26 @@ output_format = st.sidebar.selectbox(
     index=0,  # 기본값 mp3
 )
 
+# 동시 처리 파일 수 (메모리가 적은 환경을 고려해 기본값은 CPU 코어 수의 절반)
+cpu_count = os.cpu_count() or 1
+if cpu_count > 1:
+    max_workers = st.sidebar.slider(
+        "동시 처리 파일 수",
+        min_value=1,
+        max_value=cpu_count,
+        value=max(1, cpu_count // 2),
+        help="여러 파일을 병렬로 추출합니다. 메모리가 부족하면 값을 낮추세요.",
+    )
+else:
+    max_workers = 1
+
+# 추출된 파일 정보 표시 (파일마다 ffprobe를 한 번 더 실행)
+show_output_info = st.sidebar.checkbox(
+    "추출된 오디오 정보 표시",
+    value=False,
+    help="추출이 끝난 파일의 코덱, 샘플레이트 등을 로그에 표시합니다.",
+)
+
 # 메인 영역을 두 개의 컬럼으로 나누기
 col1, col2 = st.columns([1, 1])
 
@@ -347,15 +1058,34 @@ with col2:
         value="",
         help="추출된 오디오 파일명 앞에 붙일 접두사를 입력하세요."
     )
+    
+    # WAV는 압축되지 않은 PCM이므로 ZIP에서 LZMA로 더 작게 압축 가능 (대신 느림)
+    use_lzma = False
+    if output_format == "wav":
+        use_lzma = st.checkbox(
+            "ZIP 파일에 LZMA 압축 사용 (WAV)",
+            value=False,
+            help="ZIP 파일 크기가 더 작아지지만 압축 시간이 오래 걸립니다.",
+        )
 
 # 추출 버튼
 if st.button("🚀 오디오 추출 시작", type="primary"):
     if uploaded_files:
-        st.session_state.log_messages = []  # 로그 초기화
+        st.session_state.log_messages = deque(maxlen=LOG_MAX_LINES)  # 로그 초기화
         st.session_state.output_audio_paths = []
+        st.session_state.output_audio_bytes = {}
+        st.session_state.zip_paths = {}
         st.session_state.processing_complete = False
         
-        extractor = AudioExtractor()
+        # 이전 추출 작업의 임시 파일 정리 후 새 작업 디렉토리 생성
+        for work_dir in st.session_state.work_dirs.values():
+            work_dir.cleanup()
+        st.session_state.work_dirs = {
+            base_dir: tempfile.TemporaryDirectory(prefix="audio_extractor_", dir=base_dir)
+            for base_dir in {TMP_DIR, tempfile.gettempdir()}
+        }
+        
+        extractor = get_extractor()
         
         # 진행률 표시
         progress_bar = st.progress(0)
@@ -364,42 +1094,118 @@ if st.button("🚀 오디오 추출 시작", type="primary"):
         total_files = len(uploaded_files)
         successful_extractions = 0
         
+        # 각 파일의 ffmpeg 작업은 서로 독립적이므로 병렬로 실행
+        # 여러 파일을 동시에 처리할 때는 코어를 나눠 쓰도록 파일당 ffmpeg 스레드 수 제한
+        workers = min(max_workers, total_files)
+        ffmpeg_threads = 0 if workers == 1 else max(1, cpu_count // workers)
+        
+        jobs = []
+        output_audio_names = set()
+        tmpfs_reserved = 0  # tmpfs에 저장하기로 한 (아직 만들어지지 않은) 출력 파일의 예상 크기 합
         for i, uploaded_file in enumerate(uploaded_files):
-            status_text.text(f"처리 중: {uploaded_file.name} ({i+1}/{total_files})")
+            status_text.text(f"업로드 파일 저장 중: {uploaded_file.name} ({i+1}/{total_files})")
             
-            # 임시 파일로 저장
-            input_video_path = os.path.join("/tmp", uploaded_file.name)
+            # 임시 파일로 저장 (1MiB 단위로 복사하여 전체 파일을 한 번에 메모리에 올리지 않음)
+            # 같은 이름의 파일을 여러 개 올려도 서로 덮어쓰거나 삭제하지 않도록 파일마다 별도 디렉토리 사용
+            input_dir = os.path.join(
+                st.session_state.work_dirs[get_scratch_dir(tmpfs_reserved + uploaded_file.size)].name,
+                f"job_{i}",
+            )
+            os.makedirs(input_dir, exist_ok=True)
+            input_video_path = os.path.join(input_dir, uploaded_file.name)
+            uploaded_file.seek(0)
             with open(input_video_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+                shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
             
-            # 출력 파일 경로 설정
+            # 출력 파일 이름 설정 (이름이 겹치면 번호를 붙여 다운로드/ZIP에서 구분)
             base_name = Path(uploaded_file.name).stem
             if filename_prefix:
-                output_audio_name = f"{filename_prefix}_{base_name}.{output_format}"
-            else:
-                output_audio_name = f"{base_name}.{output_format}"
-            
-            output_audio_path = os.path.join("/tmp", output_audio_name)
+                base_name = f"{filename_prefix}_{base_name}"
+            output_audio_name = f"{base_name}.{output_format}"
+            duplicate_count = 1
+            while output_audio_name in output_audio_names:
+                duplicate_count += 1
+                output_audio_name = f"{base_name}_{duplicate_count}.{output_format}"
+            output_audio_names.add(output_audio_name)
             
-            st.session_state.log_messages.append(f"\n=== 파일 {i+1}/{total_files}: {uploaded_file.name} ===")
+            # 출력 파일 위치는 예상 출력 크기로 따로 결정 (WAV/FLAC 출력은 압축된 입력보다 몇 배 클 수 있음)
+            output_size = extractor.estimate_output_size(input_video_path, f".{output_format}", ffmpeg_threads)
+            if output_size is None:
+                output_base_dir = tempfile.gettempdir()  # 크기를 알 수 없으면 디스크에 저장
+            else:
+                output_base_dir = get_scratch_dir(tmpfs_reserved + output_size)
+                if output_base_dir == TMP_DIR:
+                    tmpfs_reserved += output_size
+            output_dir = os.path.join(st.session_state.work_dirs[output_base_dir].name, f"job_{i}")
+            os.makedirs(output_dir, exist_ok=True)
             
-            # 오디오 추출 실행
-            success = extractor.extract_audio(input_video_path, output_audio_path)
+            output_audio_path = os.path.join(output_dir, output_audio_name)
+            jobs.append((uploaded_file.name, input_video_path, output_audio_path))
+        
+        # 파일별 진행률 (작업 스레드가 ffmpeg 진행 상황을 기록하고, 화면 갱신은 메인 스레드에서 수행)
+        file_progress = [0.0] * total_files
+        
+        def make_progress_callback(i):
+            def update(fraction):
+                file_progress[i] = fraction
+            return update
+        
+        # 파일을 작업 스레드 수에 맞춰 그룹으로 나눔 (그룹 안의 일반 변환 대상은 ffmpeg 프로세스 하나로 처리)
+        group_size = max(1, min(BATCH_SIZE, -(-total_files // workers)))
+        groups = [
+            list(range(start, min(start + group_size, total_files)))
+            for start in range(0, total_files, group_size)
+        ]
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _extract_group,
+                    extractor,
+                    [(jobs[i][1], jobs[i][2]) for i in group],
+                    show_output_info,
+                    ffmpeg_threads,
+                    [make_progress_callback(i) for i in group],
+                ): group
+                for group in groups
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group = futures[future]
+                    for i, result in zip(group, future.result()):
+                        results[i] = result
+                        file_progress[i] = 1.0
+                        
+                        # 임시 입력 파일 삭제
+                        input_video_path = jobs[i][1]
+                        if os.path.exists(input_video_path):
+                            os.remove(input_video_path)
+                    
+                    status_text.text(f"처리 완료: {jobs[group[-1]][0]} ({len(results)}/{total_files})")
+                
+                # 진행률 업데이트 (처리 중인 파일의 진행 상황 포함)
+                progress_bar.progress(min(sum(file_progress) / total_files, 1.0))
+        
+        # 로그와 결과는 업로드 순서대로 정리
+        for i, (name, _, output_audio_path) in enumerate(jobs):
+            success, audio_bytes, log_lines = results[i]
+            st.session_state.log_messages.append(f"\n=== 파일 {i+1}/{total_files}: {name} ===")
+            st.session_state.log_messages.extend(log_lines)
             
             if success:
-                st.session_state.output_audio_paths.append(output_audio_path)
+                if audio_bytes is not None:
+                    st.session_state.output_audio_bytes[Path(output_audio_path).name] = audio_bytes
+                else:
+                    st.session_state.output_audio_paths.append(output_audio_path)
                 successful_extractions += 1
-                st.session_state.log_messages.append(f"✅ {uploaded_file.name} 추출 완료!")
+                st.session_state.log_messages.append(f"✅ {name} 추출 완료!")
             else:
-                st.session_state.log_messages.append(f"❌ {uploaded_file.name} 추출 실패!")
-            
-            # 임시 입력 파일 삭제
-            if os.path.exists(input_video_path):
-                os.remove(input_video_path)
-            
-            # 진행률 업데이트
-            progress_bar.progress((i + 1) / total_files)
+                st.session_state.log_messages.append(f"❌ {name} 추출 실패!")
         
+        st.session_state.log_text_cache = None  # 로그가 바뀌었으므로 표시 문자열 다시 생성
         status_text.text(f"완료! {successful_extractions}/{total_files} 파일 추출 성공")
         st.session_state.processing_complete = True
         
@@ -411,33 +1217,58 @@ if st.button("🚀 오디오 추출 시작", type="primary"):
         st.warning("⚠️ 비디오 파일을 먼저 업로드해주세요.")
 
 # 다운로드 섹션
-if st.session_state.processing_complete and st.session_state.output_audio_paths:
+has_outputs = st.session_state.output_audio_paths or st.session_state.output_audio_bytes
+if st.session_state.processing_complete and has_outputs:
     st.subheader("📥 다운로드")
     
     if download_option == "개별 다운로드":
         st.write("각 파일을 개별적으로 다운로드할 수 있습니다:")
         
+        for name, audio_bytes in st.session_state.output_audio_bytes.items():
+            st.download_button(
+                label=f"📁 {name} 다운로드",
+                data=audio_bytes,
+                file_name=name,
+                mime=f"audio/{output_format}",
+                key=f"download_{name}"
+            )
+        
+        # 파일로 저장된 오디오는 다운로드 버튼을 눌렀을 때만 읽음
         for output_path in st.session_state.output_audio_paths:
             if os.path.exists(output_path):
-                with open(output_path, "rb") as f:
-                    st.download_button(
-                        label=f"📁 {Path(output_path).name} 다운로드",
-                        data=f.read(),
-                        file_name=Path(output_path).name,
-                        mime=f"audio/{output_format}",
-                        key=f"download_{Path(output_path).name}"
-                    )
+                st.download_button(
+                    label=f"📁 {Path(output_path).name} 다운로드",
+                    data=lambda output_path=output_path: Path(output_path).read_bytes(),
+                    file_name=Path(output_path).name,
+                    mime=f"audio/{output_format}",
+                    key=f"download_{Path(output_path).name}"
+                )
     
     else:  # ZIP 파일로 일괄 다운로드
         existing_files = [path for path in st.session_state.output_audio_paths if os.path.exists(path)]
+        audio_bytes = st.session_state.output_audio_bytes
+        file_count = len(existing_files) + len(audio_bytes)
         
-        if existing_files:
-            zip_data = create_zip_file(existing_files, f"extracted_audio_{output_format}.zip")
+        if file_count:
+            zip_name = f"extracted_audio_{output_format}.zip"
+            
+            # ZIP은 추출 작업마다 한 번만 만들고, 이후 재실행(rerun)에서는 같은 파일을 재사용
+            zip_path = st.session_state.zip_paths.get(use_lzma)
+            if zip_path is None or not os.path.exists(zip_path):
+                zip_size = sum(os.path.getsize(path) for path in existing_files) + sum(
+                    len(data) for data in audio_bytes.values()
+                )
+                zip_dir = st.session_state.work_dirs[get_scratch_dir(zip_size)].name
+                with tempfile.NamedTemporaryFile(dir=zip_dir, suffix=".zip", delete=False) as f:
+                    zip_path = f.name
+                create_zip_file(existing_files, zip_path, audio_bytes, use_lzma)
+                st.session_state.zip_paths[use_lzma] = zip_path
             
+            # 다운로드 버튼을 눌렀을 때만 ZIP 파일을 읽음 (재실행마다 ZIP 전체를 메모리에 올리지 않음)
             st.download_button(
-                label=f"📦 모든 오디오 파일 ZIP으로 다운로드 ({len(existing_files)}개 파일)",
-                data=zip_data,
-                file_name=f"extracted_audio_{output_format}.zip",
+                label=f"📦 모든 오디오 파일 ZIP으로 다운로드 ({file_count}개 파일)",
+                data=lambda zip_path=zip_path: Path(zip_path).read_bytes(),
+                file_name=zip_name,
                 mime="application/zip"
             )
 
@@ -447,8 +1278,9 @@ log_container = st.container()
 with log_container:
     if st.session_state.log_messages:
         # 로그를 텍스트 영역에 표시 (스크롤 가능)
-        log_text = "\n".join(st.session_state.log_messages)
-        st.text_area("로그 메시지", value=log_text, height=300, disabled=True)
+        if st.session_state.log_text_cache is None:
+            st.session_state.log_text_cache = "\n".join(st.session_state.log_messages)
+        st.text_area("로그 메시지", value=st.session_state.log_text_cache, height=300, disabled=True)
     else:
         st.info("아직 처리된 파일이 없습니다.")
 